@@ -5,24 +5,109 @@ Get your free API key at: https://bestbuyapis.github.io/bby-query-builder/
 Free tier: 50,000 calls per day
 """
 
+import functools
+import logging
+import orjson
+import random
 import requests
+import threading
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Optional, Tuple
 import config
 
 
+log = logging.getLogger('pricebot')
+
+# Each category is searched as independent price bands, each with its own
+# max_results budget, so results sorted by salePrice.asc reach beyond the
+# cheapest products; each band still sees only its own cheapest products
+PRICE_BANDS = [
+    'salePrice<200',
+    'salePrice>=200&salePrice<500',
+    'salePrice>=500',
+]
+
+
+@functools.lru_cache(maxsize=None)
+def threshold_fraction(threshold: float) -> Tuple[int, int]:
+    """
+    Express a price-ratio threshold as an integer fraction.
+    
+    Args:
+        threshold: Max fraction of retail price (e.g., 0.35)
+        
+    Returns:
+        Tuple of (numerator, denominator), e.g. (7, 20) for 0.35
+    """
+    fraction = Fraction(str(threshold)).limit_denominator(10000)
+    return fraction.numerator, fraction.denominator
+
+
+def is_deep_discount(current_price: float, retail_price: float, threshold: float) -> bool:
+    """
+    Check whether a price is at or below a fraction of retail, compared exactly in integer cents.
+    
+    Args:
+        current_price: Current (sale) price
+        retail_price: Regular retail price
+        threshold: Max fraction of retail price (e.g., 0.35)
+        
+    Returns:
+        True if current_price <= threshold * retail_price
+    """
+    retail_cents = round(retail_price * 100)
+    if retail_cents <= 0:
+        return False
+    thr_num, thr_den = threshold_fraction(threshold)
+    return round(current_price * 100) * thr_den <= thr_num * retail_cents
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    Allows bursts up to `capacity` requests, refilling at `rate` tokens per second.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            # Reserve the token now; callers that overdraw wait for the refill
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        
+        if wait > 0:
+            # Small jitter so concurrent workers don't all wake at once
+            time.sleep(wait + random.uniform(0, 0.05))
+
+
 class BestBuyAPIScraper:
     """
     Official Best Buy API scraper.
     Much more reliable than web scraping - no blocking issues!
     """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_workers: int = 8, rate_limit: float = 5):
         """
         Initialize API scraper.
         
         Args:
             api_key: Your Best Buy API key from https://bestbuyapis.github.io/
+            max_workers: Max concurrent page requests per category (default: 8)
+            rate_limit: Max API requests per second (default: 5)
         """
         if not api_key or api_key == 'YOUR_API_KEY_HERE':
             raise ValueError(
@@ -34,8 +119,47 @@ class BestBuyAPIScraper:
         self.api_key = api_key
         self.base_url = "https://api.bestbuy.com/v1"
         self.session = requests.Session()
+        self.max_workers = max_workers
+        
+        # Keep enough warm connections for every category/band's workers and
+        # retry transient/rate-limit errors with backoff
+        pool_size = max_workers * 2 * len(PRICE_BANDS)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            # Adapter retries bypass the token bucket, so a 429 waits for the
+            # server's Retry-After (or the backoff) instead of the limiter
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET'],
+                respect_retry_after_header=True
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive'
+        })
+        self.limiter = TokenBucket(rate=rate_limit, capacity=rate_limit)
+        # cache key -> (ETag, Last-Modified, products, total pages) for conditional GETs
+        self.validators: Dict[Tuple, Tuple[Optional[str], Optional[str], List[Dict], int]] = {}
+        self.discount_threshold = config.DISCOUNT_THRESHOLD
     
-    def search_products(self, category: str, page: int = 1, page_size: int = 100) -> List[Dict]:
+    def __enter__(self) -> 'BestBuyAPIScraper':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Close pooled HTTP connections."""
+        self.session.close()
+    
+    def search_products(self, category: str, page: int = 1, page_size: int = 100,
+                        discount_threshold: Optional[float] = None,
+                        price_band: str = '') -> List[Dict]:
         """
         Search for products in a category.
         
@@ -43,13 +167,40 @@ class BestBuyAPIScraper:
             category: Category to search (e.g., "laptop", "desktop computer")
             page: Page number (default: 1)
             page_size: Items per page, max 100 (default: 100)
+            discount_threshold: If set, only return products priced at or below
+                this fraction of retail (default: None, return everything)
+            price_band: Extra price filter, e.g. 'salePrice<200' (default: none)
             
         Returns:
             List of product dictionaries
         """
+        products, _ = self._fetch_page(category, page, page_size, discount_threshold, price_band)
+        return products
+    
+    def _fetch_page(self, category: str, page: int, page_size: int,
+                    discount_threshold: Optional[float] = None,
+                    price_band: str = '') -> Tuple[List[Dict], int]:
+        """
+        Fetch a single page of search results.
+        
+        Args:
+            category: Category to search
+            page: Page number
+            page_size: Items per page, max 100
+            discount_threshold: If set, skip products priced above this fraction of retail
+            price_band: Extra price filter added to the query
+            
+        Returns:
+            Tuple of (product dictionaries, total number of pages)
+        """
+        label = f"{category} [{price_band}]" if price_band else category
+        cache_key = (category, price_band, page, page_size, discount_threshold)
         # Build the search query
         # Search for active products with prices in the specified category
-        query = f'(search={category}&active=true&salePrice>0)'
+        filters = f'search={category}&active=true&salePrice>0'
+        if price_band:
+            filters += f'&{price_band}'
+        query = f'({filters})'
         
         # Build the API URL
         url = f"{self.base_url}/products{query}"
@@ -57,159 +208,237 @@ class BestBuyAPIScraper:
         params = {
             'apiKey': self.api_key,
             'format': 'json',
-            'show': 'sku,name,salePrice,regularPrice,onSale,url,image,categoryPath.name',
+            'show': 'sku,name,salePrice,regularPrice,onSale,url',  # Only fields _parse_product uses
             'pageSize': min(page_size, 100),  # API max is 100
             'page': page,
             'sort': 'salePrice.asc'  # Sort by price ascending
         }
         
+        # Revalidate a previously seen page so an unchanged one comes back as 304
+        headers = {}
+        validator = self.validators.get(cache_key)
+        if validator is not None:
+            etag, last_modified, _, _ = validator
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
         try:
-            print(f"🔍 Searching Best Buy API for: {category} (page {page})")
-            response = self.session.get(url, params=params, timeout=30)
+            log.info("🔍 Searching Best Buy API for: %s (page %d)", label, page)
+            self.limiter.acquire()
+            response = self.session.get(url, params=params, headers=headers, timeout=30)
+            
+            if response.status_code == 304 and validator is not None:
+                _, _, products, total_pages = validator
+                log.info("♻️  Page unchanged since last check: %s (page %d)", label, page)
+                return list(products), total_pages
+            
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             products = []
             for item in data.get('products', []):
-                product = self._parse_product(item)
+                # Reject non-deals before building the full product dict
+                if discount_threshold is not None and not is_deep_discount(
+                        item.get('salePrice') or 0, item.get('regularPrice') or 0, discount_threshold):
+                    continue
+                
+                product = self._parse_product(item, discount_threshold)
                 if product:
                     products.append(product)
             
-            total = data.get('total', 0)
-            print(f"✅ Found {len(products)} products on this page ({total} total matches)")
+            log.info("✅ Found %d products on this page (%d total matches)",
+                     len(products), data.get('total', 0))
+            
+            total_pages = data.get('totalPages', 0)
+            if total_pages:
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if etag or last_modified:
+                    self.validators[cache_key] = (etag, last_modified, products, total_pages)
             
-            return products
+            return list(products), total_pages
             
         except requests.RequestException as e:
-            print(f"❌ API request error: {e}")
-            return []
-        except Exception as e:
-            print(f"❌ Error parsing API response: {e}")
-            return []
+            log.error("❌ API request error: %s", e)
+            return [], 0
+        except orjson.JSONDecodeError as e:
+            # Only a malformed body is expected here; anything else is a bug
+            # and should surface with a traceback
+            log.error("❌ Error parsing API response: %s", e)
+            return [], 0
     
-    def search_laptops(self, max_results: int = 100) -> List[Dict]:
+    def search_laptops(self, max_results: int = 100,
+                       discount_threshold: Optional[float] = None) -> List[Dict]:
         """
         Search for laptop deals.
         
         Args:
-            max_results: Maximum number of results to return (default: 100)
+            max_results: Maximum number of results per price band (default: 100)
+            discount_threshold: If set, only return deals at or below this fraction of retail
             
         Returns:
             List of product dictionaries
         """
-        all_products = []
-        page = 1
-        page_size = min(max_results, 100)
+        return self._search_category("laptop", max_results, discount_threshold)
+    
+    def search_desktops(self, max_results: int = 100,
+                        discount_threshold: Optional[float] = None) -> List[Dict]:
+        """
+        Search for desktop computer deals.
         
-        while len(all_products) < max_results:
-            products = self.search_products("laptop", page=page, page_size=page_size)
-            
-            if not products:
-                break
-            
-            all_products.extend(products)
+        Args:
+            max_results: Maximum number of results per price band (default: 100)
+            discount_threshold: If set, only return deals at or below this fraction of retail
             
-            # Stop if we've gotten enough or if this page wasn't full
-            if len(products) < page_size or len(all_products) >= max_results:
-                break
+        Returns:
+            List of product dictionaries
+        """
+        return self._search_category("desktop computer", max_results, discount_threshold)
+    
+    def _search_category(self, category: str, max_results: int,
+                         discount_threshold: Optional[float] = None) -> List[Dict]:
+        """
+        Search a category across all price bands concurrently.
+        
+        Each of PRICE_BANDS gets the full max_results budget (one page at the
+        default of 100), and products returned by more than one band are
+        deduplicated by SKU.
+        
+        Args:
+            category: Category to search
+            max_results: Maximum number of results per price band
+            discount_threshold: If set, only return deals at or below this fraction of retail
             
-            page += 1
-            time.sleep(0.5)  # Be nice to the API
+        Returns:
+            List of product dictionaries
+        """
+        with ThreadPoolExecutor(max_workers=len(PRICE_BANDS)) as executor:
+            results = executor.map(
+                lambda band: self._search_band(category, band, max_results, discount_threshold),
+                PRICE_BANDS
+            )
+            all_products = []
+            seen_skus = set()
+            for products in results:
+                for product in products:
+                    if product['sku'] not in seen_skus:
+                        seen_skus.add(product['sku'])
+                        all_products.append(product)
         
-        return all_products[:max_results]
+        return all_products
     
-    def search_desktops(self, max_results: int = 100) -> List[Dict]:
+    def _search_band(self, category: str, price_band: str, max_results: int,
+                     discount_threshold: Optional[float] = None) -> List[Dict]:
         """
-        Search for desktop computer deals.
+        Fetch all pages needed for one price band of a category.
+        
+        Page 1 is fetched first to learn how many pages exist, then the
+        remaining pages are requested concurrently.
         
         Args:
-            max_results: Maximum number of results to return (default: 100)
+            category: Category to search
+            price_band: Price filter for this band
+            max_results: Maximum number of results to return
+            discount_threshold: If set, only return deals at or below this fraction of retail
             
         Returns:
             List of product dictionaries
         """
-        all_products = []
-        page = 1
         page_size = min(max_results, 100)
+        if page_size <= 0:
+            return []
         
-        while len(all_products) < max_results:
-            products = self.search_products("desktop computer", page=page, page_size=page_size)
-            
-            if not products:
-                break
-            
-            all_products.extend(products)
-            
-            if len(products) < page_size or len(all_products) >= max_results:
-                break
-            
-            page += 1
-            time.sleep(0.5)
+        all_products, total_pages = self._fetch_page(category, 1, page_size, discount_threshold, price_band)
+        
+        # Only request as many pages as we need to reach max_results
+        pages_needed = -(-max_results // page_size)
+        last_page = min(total_pages, pages_needed)
+        
+        if last_page > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = executor.map(
+                    lambda page: self.search_products(category, page=page, page_size=page_size,
+                                                      discount_threshold=discount_threshold,
+                                                      price_band=price_band),
+                    range(2, last_page + 1)
+                )
+                for products in results:
+                    all_products.extend(products)
         
         return all_products[:max_results]
     
-    def _parse_product(self, item: Dict) -> Optional[Dict]:
+    def _parse_product(self, item: Dict, discount_threshold: Optional[float] = None) -> Optional[Dict]:
         """
         Parse product data from API response.
         
         Args:
             item: Product dictionary from API
+            discount_threshold: Threshold used to tag deals (default: the
+                scraper's configured threshold)
             
         Returns:
             Standardized product dictionary
         """
         try:
-            sku = item.get('sku')
-            name = item.get('name', '')
-            sale_price = float(item.get('salePrice', 0))
-            regular_price = float(item.get('regularPrice', 0))
-            url = item.get('url', '')
-            
-            # If no regular price, use sale price
-            if regular_price == 0:
-                regular_price = sale_price
-            
-            # Calculate discount
-            discount_percent = 0.0
-            if regular_price > 0 and sale_price < regular_price:
-                discount_percent = ((regular_price - sale_price) / regular_price) * 100
-            
-            return {
-                'sku': sku,
-                'name': name,
-                'current_price': sale_price,
-                'retail_price': regular_price,
-                'url': url,
-                'discount_percent': round(discount_percent, 2),
-                'on_sale': item.get('onSale', False)
-            }
-            
-        except Exception as e:
-            print(f"Error parsing product: {e}")
+            sku = item['sku']
+        except KeyError as e:
+            log.warning("Error parsing product: missing %s", e)
             return None
+        
+        # The API returns JSON numbers, so no float() coercion is needed;
+        # a missing/null regular price falls back to the sale price
+        sale_price = item.get('salePrice') or 0.0
+        regular_price = item.get('regularPrice') or sale_price
+        
+        # Calculate discount
+        discount_percent = 0.0
+        if regular_price > 0 and sale_price < regular_price:
+            discount_percent = ((regular_price - sale_price) / regular_price) * 100
+        
+        # Tag deals now so find_deep_discounts needs no arithmetic, using the
+        # same threshold the page was filtered with
+        if discount_threshold is None:
+            discount_threshold = self.discount_threshold
+        
+        return {
+            'sku': sku,
+            'name': item.get('name', ''),
+            'current_price': sale_price,
+            'retail_price': regular_price,
+            'url': item.get('url', ''),
+            'discount_percent': round(discount_percent, 2),
+            'on_sale': item.get('onSale', False),
+            'is_deep_discount': is_deep_discount(sale_price, regular_price, discount_threshold)
+        }
     
-    def scrape_all_categories(self, max_per_category: int = 100) -> List[Dict]:
+    def scrape_all_categories(self, max_per_category: int = 100,
+                              discount_threshold: Optional[float] = None) -> List[Dict]:
         """
         Search all configured categories.
         
         Args:
-            max_per_category: Max results per category (default: 100)
+            max_per_category: Max results per price band of each category (default: 100)
+            discount_threshold: If set, only return deals at or below this fraction of retail
             
         Returns:
             List of all products found
         """
         all_products = []
         
-        print("📱 Searching for laptops...")
-        laptops = self.search_laptops(max_results=max_per_category)
-        all_products.extend(laptops)
-        
-        print("\n🖥️  Searching for desktop computers...")
-        desktops = self.search_desktops(max_results=max_per_category)
-        all_products.extend(desktops)
+        log.info("📱 Searching for laptops...")
+        log.info("🖥️  Searching for desktop computers...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            laptops = executor.submit(self.search_laptops, max_results=max_per_category,
+                                      discount_threshold=discount_threshold)
+            desktops = executor.submit(self.search_desktops, max_results=max_per_category,
+                                       discount_threshold=discount_threshold)
+            all_products.extend(laptops.result())
+            all_products.extend(desktops.result())
         
-        print(f"\n✅ Total products found: {len(all_products)}")
+        log.info("✅ Total products found: %d", len(all_products))
         return all_products
     
     def find_deep_discounts(self, products: List[Dict]) -> List[Dict]:
@@ -223,25 +452,38 @@ class BestBuyAPIScraper:
             List of products meeting the discount threshold
         """
         deep_discounts = []
-        
         for product in products:
-            current_price = product.get('current_price', 0)
-            retail_price = product.get('retail_price', 0)
-            
-            if retail_price > 0:
-                # Calculate what percentage of retail the current price is
-                price_ratio = current_price / retail_price
-                
-                # If current price is 35% or less of retail (65%+ discount)
-                if price_ratio <= config.DISCOUNT_THRESHOLD:
-                    deep_discounts.append(product)
-                    print(f"🎯 DEAL FOUND: {product['name']}")
-                    print(f"   SKU: {product['sku']}")
-                    print(f"   Current: ${current_price:.2f} | Retail: ${retail_price:.2f}")
-                    print(f"   Discount: {product['discount_percent']:.1f}%")
-                    print(f"   URL: {product['url']}\n")
+            # Products from _parse_product are already tagged; compute it for
+            # any other product dict (35% or less of retail = 65%+ discount)
+            deal = product.get('is_deep_discount')
+            if deal is None:
+                deal = is_deep_discount(product.get('current_price', 0),
+                                        product.get('retail_price', 0),
+                                        self.discount_threshold)
+            if deal:
+                deep_discounts.append(product)
         
         return deep_discounts
+    
+    def report_deals(self, deals: List[Dict]) -> None:
+        """
+        Log details of each deal found.
+        
+        Args:
+            deals: List of deal dictionaries
+        """
+        if not deals or not log.isEnabledFor(logging.INFO):
+            return
+        
+        # One log record for the whole batch instead of one write per line
+        log.info(''.join(
+            f"🎯 DEAL FOUND: {product['name']}\n"
+            f"   SKU: {product['sku']}\n"
+            f"   Current: ${product['current_price']:.2f} | Retail: ${product['retail_price']:.2f}\n"
+            f"   Discount: {product['discount_percent']:.1f}%\n"
+            f"   URL: {product['url']}\n\n"
+            for product in deals
+        ))
 
 
 # Example usage and testing
@@ -265,14 +507,15 @@ if __name__ == '__main__':
         print("="*80)
     else:
         print("🚀 Testing Best Buy API Scraper...\n")
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
         
-        scraper = BestBuyAPIScraper(api_key)
-        
-        # Search for laptops on sale
-        products = scraper.scrape_all_categories(max_per_category=50)
-        
-        # Find deep discounts
-        deals = scraper.find_deep_discounts(products)
+        with BestBuyAPIScraper(api_key) as scraper:
+            # Search for laptops on sale
+            products = scraper.scrape_all_categories(max_per_category=50)
+            
+            # Find deep discounts
+            deals = scraper.find_deep_discounts(products)
+            scraper.report_deals(deals)
         
         print(f"\n{'='*80}")
         print(f"📊 Results Summary:")
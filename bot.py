@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Main bot script for monitoring Best Buy deals."""
-import schedule
+import logging
+import sched
+import signal
 import time
 from datetime import datetime
 import sys
@@ -32,6 +34,8 @@ class PriceBot:
         self.notifier = Notifier()
         self.storage = DealStorage()
         self.run_count = 0
+        self.discount_threshold = config.DISCOUNT_THRESHOLD
+        self.check_interval = config.CHECK_INTERVAL_MINUTES
     
     def check_for_deals(self) -> None:
         """Main function to check for deals and send notifications."""
@@ -42,14 +46,13 @@ class PriceBot:
         print(f"{'='*80}\n")
         
         try:
-            # Query Best Buy API for products
-            print("🔍 Querying Best Buy API for laptops and computers...")
-            products = self.scraper.scrape_all_categories(max_per_category=100)
-            print(f"Found {len(products)} total products\n")
-            
-            # Filter for deep discounts (65% or more off)
-            print(f"🎯 Filtering for deals 65% or more off retail...")
-            deep_discounts = self.scraper.find_deep_discounts(products)
+            # Query Best Buy API for deep discounts (65% or more off),
+            # filtering while parsing each page
+            print("🔍 Querying Best Buy API for laptop and computer deals 65% or more off retail...")
+            deep_discounts = self.scraper.scrape_all_categories(
+                max_per_category=100,
+                discount_threshold=self.discount_threshold
+            )
             
             if deep_discounts:
                 print(f"✅ Found {len(deep_discounts)} product(s) with 65%+ discount!\n")
@@ -70,7 +73,7 @@ class PriceBot:
             else:
                 print("❌ No products found with 65%+ discount at this time.\n")
             
-            print(f"✅ Check complete. Next check in {config.CHECK_INTERVAL_MINUTES} minutes.\n")
+            print(f"✅ Check complete. Next check in {self.check_interval} minutes.\n")
             
         except KeyboardInterrupt:
             raise
@@ -79,38 +82,52 @@ class PriceBot:
             import traceback
             traceback.print_exc()
     
+    def close(self) -> None:
+        """Flush pending deals and release network connections."""
+        self.storage.flush()
+        self.notifier.close()
+        self.scraper.close()
+    
     def run_once(self) -> None:
         """Run the bot once and exit."""
         print("🚀 Starting Price Bot (single run mode)...\n")
         self.check_for_deals()
+        self.close()
         print("✅ Single run complete. Exiting.")
     
     def run_scheduled(self) -> None:
         """Run the bot on a schedule continuously."""
         print("🚀 Starting Price Bot (scheduled mode)...")
-        print(f"⏰ Will check every {config.CHECK_INTERVAL_MINUTES} minutes")
+        print(f"⏰ Will check every {self.check_interval} minutes")
         print(f"📧 Email notifications: {'Enabled' if config.ENABLE_EMAIL_NOTIFICATIONS else 'Disabled'}")
         print(f"💾 Deals log: {config.DEALS_LOG_FILE}")
         print("\nPress Ctrl+C to stop the bot.\n")
         
-        # Run immediately on start
-        self.check_for_deals()
+        # Sleep exactly until the next check instead of polling the clock
+        scheduler = sched.scheduler(time.monotonic, time.sleep)
         
-        # Schedule periodic checks
-        schedule.every(config.CHECK_INTERVAL_MINUTES).minutes.do(self.check_for_deals)
+        def scheduled_check() -> None:
+            self.check_for_deals()
+            scheduler.enter(self.check_interval * 60, 1, scheduled_check)
         
-        # Keep running
+        # Run immediately on start, then every interval after each check finishes
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(1)
+            scheduled_check()
+            scheduler.run()
         except KeyboardInterrupt:
             print("\n\n🛑 Bot stopped by user. Goodbye!")
             sys.exit(0)
+        finally:
+            # Also reached on SIGTERM (see main), so buffered deals are saved
+            self.close()
 
 
 def main():
     """Main entry point."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    # atexit handlers don't run on SIGTERM (e.g. docker stop, systemctl stop),
+    # so turn it into a normal exit that flushes the deal log
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     bot = PriceBot()
     
     # Check command line arguments
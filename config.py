@@ -15,7 +15,8 @@ DISCOUNT_THRESHOLD = 0.35  # Item must be 35% or less of retail price
 # Notification settings
 ENABLE_EMAIL_NOTIFICATIONS = os.getenv('ENABLE_EMAIL_NOTIFICATIONS', 'false').lower() == 'true'
 EMAIL_FROM = os.getenv('EMAIL_FROM', '')
-EMAIL_TO = os.getenv('EMAIL_TO', '')
+EMAIL_TO = os.getenv('EMAIL_TO', '')  # Comma-separated for multiple recipients
+EMAIL_RECIPIENTS = [addr.strip() for addr in EMAIL_TO.split(',') if addr.strip()]
 EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD', '')
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
@@ -25,5 +26,7 @@ CHECK_INTERVAL_MINUTES = int(os.getenv('CHECK_INTERVAL_MINUTES', '30'))
 MAX_PRODUCTS_PER_CATEGORY = int(os.getenv('MAX_PRODUCTS_PER_CATEGORY', '100'))
 
 # Storage
-DEALS_LOG_FILE = 'deals_found.json'
+DEALS_LOG_FILE = 'deals_found.jsonl'  # One JSON deal per line
+# Number of new deals to buffer before appending them to the log (1 = write every save)
+DEALS_SAVE_BATCH_SIZE = int(os.getenv('DEALS_SAVE_BATCH_SIZE', '1'))
 
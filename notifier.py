@@ -1,5 +1,8 @@
 """Notification system for alerting about deals."""
+import copy
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import List, Dict
@@ -7,11 +10,176 @@ from datetime import datetime
 import config
 
 
+# Max number of idle SMTP connections kept open (and concurrent sends)
+SMTP_POOL_SIZE = 3
+
+# Email templates, built once at import instead of on every send
+_TEXT_HEADER = (
+    "Found {count} deep discount(s) on Best Buy!\n\n"
+    "Time: {timestamp}\n"
+    + "="*60 + "\n\n"
+)
+
+_TEXT_DEAL = (
+    "Deal #{index}:\n"
+    "Product: {name}\n"
+    "Current Price: ${current_price:.2f}\n"
+    "Retail Price: ${retail_price:.2f}\n"
+    "Discount: {discount_percent:.1f}%\n"
+    "You Save: ${savings:.2f}\n"
+    "Link: {url}\n"
+    "\n" + "-"*60 + "\n\n"
+)
+
+_STYLE_BLOCK = """
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                .header { background-color: #0046be; color: white; padding: 20px; text-align: center; border-radius: 5px; }
+                .deal { background-color: #f5f5f5; margin: 20px 0; padding: 15px; border-radius: 5px; border-left: 4px solid #0046be; }
+                .deal-title { font-size: 16px; font-weight: bold; margin-bottom: 10px; color: #0046be; }
+                .price-info { margin: 10px 0; }
+                .current-price { font-size: 24px; font-weight: bold; color: #c5281c; }
+                .retail-price { text-decoration: line-through; color: #666; }
+                .discount { background-color: #c5281c; color: white; padding: 5px 10px; border-radius: 3px; font-weight: bold; }
+                .savings { color: #008a00; font-weight: bold; }
+                .button { display: inline-block; background-color: #0046be; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; margin-top: 10px; }
+                .footer { text-align: center; margin-top: 30px; color: #666; font-size: 12px; }
+            </style>
+"""
+
+_HTML_HEADER = """
+        <html>
+        <head>""" + _STYLE_BLOCK + """        </head>
+        <body>
+            <div class="container">
+"""
+
+_HTML_BANNER = """
+                <div class="header">
+                    <h1>🚨 Best Buy Deals Alert!</h1>
+                    <p>Found {count} deep discount(s) - 65%+ off!</p>
+                    <p style="font-size: 14px;">{timestamp}</p>
+                </div>
+"""
+
+_HTML_DEAL = """
+                <div class="deal">
+                    <div class="deal-title">Deal #{index}: {name}</div>
+                    <div class="price-info">
+                        <span class="current-price">${current_price:.2f}</span>
+                        <span class="retail-price"> was ${retail_price:.2f}</span>
+                    </div>
+                    <div style="margin: 10px 0;">
+                        <span class="discount">{discount_percent:.1f}% OFF</span>
+                        <span class="savings"> You save ${savings:.2f}!</span>
+                    </div>
+                    <a href="{url}" class="button">View Deal on Best Buy</a>
+                </div>
+"""
+
+_HTML_FOOTER = """
+                <div class="footer">
+                    <p>This is an automated notification from your Best Buy Price Bot.</p>
+                    <p>Act fast - deals may expire quickly!</p>
+                </div>
+            </div>
+        </body>
+        </html>
+"""
+
+
 class Notifier:
     """Handle notifications for deals found."""
     
     def __init__(self):
         self.email_enabled = config.ENABLE_EMAIL_NOTIFICATIONS
+        self._smtp_pool: List[smtplib.SMTP] = []
+        self._smtp_lock = threading.Lock()
+    
+    def close(self) -> None:
+        """Close all pooled SMTP connections."""
+        with self._smtp_lock:
+            pool, self._smtp_pool = self._smtp_pool, []
+        
+        for server in pool:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+    
+    def _get_smtp(self) -> smtplib.SMTP:
+        """
+        Check out a logged-in SMTP connection, reusing an idle pooled one while it is alive.
+        
+        Pooled connections stay open between checks; one the server has
+        dropped while idle fails the NOOP probe and is replaced.
+        
+        Returns:
+            Authenticated SMTP connection
+        """
+        while True:
+            with self._smtp_lock:
+                if not self._smtp_pool:
+                    break
+                server = self._smtp_pool.pop()
+            
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            server.close()
+        
+        server = smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT, timeout=30)
+        try:
+            server.starttls()
+            server.login(config.EMAIL_FROM, config.EMAIL_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        
+        return server
+    
+    def _release_smtp(self, server: smtplib.SMTP) -> None:
+        """
+        Return a connection to the pool, or close it if the pool is full.
+        
+        Args:
+            server: Connection previously checked out with _get_smtp
+        """
+        with self._smtp_lock:
+            if len(self._smtp_pool) < SMTP_POOL_SIZE:
+                self._smtp_pool.append(server)
+                return
+        
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+    
+    def _send_one(self, msg: MIMEMultipart, recipients: List[str]) -> None:
+        """
+        Send a message over a pooled connection.
+        
+        Args:
+            msg: Message to send
+            recipients: Envelope recipient addresses
+        """
+        server = self._get_smtp()
+        try:
+            try:
+                server.send_message(msg, to_addrs=recipients)
+            except smtplib.SMTPServerDisconnected:
+                # Server dropped the connection between the NOOP and the send
+                server.close()
+                server = self._get_smtp()
+                server.send_message(msg, to_addrs=recipients)
+        except Exception:
+            server.close()
+            raise
+        
+        self._release_smtp(server)
         
     def notify(self, deals: List[Dict]) -> None:
         """
@@ -64,7 +232,7 @@ class Notifier:
         Args:
             deals: List of deal dictionaries
         """
-        if not all([config.EMAIL_FROM, config.EMAIL_TO, config.EMAIL_PASSWORD]):
+        if not all([config.EMAIL_FROM, config.EMAIL_RECIPIENTS, config.EMAIL_PASSWORD]):
             print("Email credentials not configured. Skipping email notification.")
             return
         
@@ -84,10 +252,20 @@ class Notifier:
         msg.attach(html_part)
         
         try:
-            with smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT) as server:
-                server.starttls()
-                server.login(config.EMAIL_FROM, config.EMAIL_PASSWORD)
-                server.send_message(msg)
+            recipients = config.EMAIL_RECIPIENTS
+            if len(recipients) == 1:
+                self._send_one(msg, recipients)
+            else:
+                # Deliver to each recipient independently so one slow
+                # recipient doesn't hold up the rest
+                with ThreadPoolExecutor(max_workers=SMTP_POOL_SIZE) as executor:
+                    futures = [
+                        executor.submit(self._send_one, copy.deepcopy(msg), [recipient])
+                        for recipient in recipients
+                    ]
+                    wait(futures)
+                for future in futures:
+                    future.result()
             
             print(f"✅ Email notification sent to {config.EMAIL_TO}")
         except Exception as e:
@@ -104,21 +282,15 @@ class Notifier:
         Returns:
             Formatted email body string
         """
-        body = f"Found {len(deals)} deep discount(s) on Best Buy!\n\n"
-        body += f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        body += "="*60 + "\n\n"
-        
-        for i, deal in enumerate(deals, 1):
-            body += f"Deal #{i}:\n"
-            body += f"Product: {deal['name']}\n"
-            body += f"Current Price: ${deal['current_price']:.2f}\n"
-            body += f"Retail Price: ${deal['retail_price']:.2f}\n"
-            body += f"Discount: {deal['discount_percent']:.1f}%\n"
-            body += f"You Save: ${deal['retail_price'] - deal['current_price']:.2f}\n"
-            body += f"Link: {deal['url']}\n"
-            body += "\n" + "-"*60 + "\n\n"
-        
-        return body
+        header = _TEXT_HEADER.format(
+            count=len(deals),
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
+        deal_blocks = [
+            _TEXT_DEAL.format(index=i, savings=deal['retail_price'] - deal['current_price'], **deal)
+            for i, deal in enumerate(deals, 1)
+        ]
+        return header + ''.join(deal_blocks)
     
     def _format_email_html(self, deals: List[Dict]) -> str:
         """
@@ -130,59 +302,12 @@ class Notifier:
         Returns:
             Formatted HTML email body string
         """
-        html = """
-        <html>
-        <head>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                .header { background-color: #0046be; color: white; padding: 20px; text-align: center; border-radius: 5px; }
-                .deal { background-color: #f5f5f5; margin: 20px 0; padding: 15px; border-radius: 5px; border-left: 4px solid #0046be; }
-                .deal-title { font-size: 16px; font-weight: bold; margin-bottom: 10px; color: #0046be; }
-                .price-info { margin: 10px 0; }
-                .current-price { font-size: 24px; font-weight: bold; color: #c5281c; }
-                .retail-price { text-decoration: line-through; color: #666; }
-                .discount { background-color: #c5281c; color: white; padding: 5px 10px; border-radius: 3px; font-weight: bold; }
-                .savings { color: #008a00; font-weight: bold; }
-                .button { display: inline-block; background-color: #0046be; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; margin-top: 10px; }
-                .footer { text-align: center; margin-top: 30px; color: #666; font-size: 12px; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🚨 Best Buy Deals Alert!</h1>
-                    <p>Found """ + str(len(deals)) + """ deep discount(s) - 65%+ off!</p>
-                    <p style="font-size: 14px;">""" + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """</p>
-                </div>
-        """
-        
-        for i, deal in enumerate(deals, 1):
-            savings = deal['retail_price'] - deal['current_price']
-            html += f"""
-                <div class="deal">
-                    <div class="deal-title">Deal #{i}: {deal['name']}</div>
-                    <div class="price-info">
-                        <span class="current-price">${deal['current_price']:.2f}</span>
-                        <span class="retail-price"> was ${deal['retail_price']:.2f}</span>
-                    </div>
-                    <div style="margin: 10px 0;">
-                        <span class="discount">{deal['discount_percent']:.1f}% OFF</span>
-                        <span class="savings"> You save ${savings:.2f}!</span>
-                    </div>
-                    <a href="{deal['url']}" class="button">View Deal on Best Buy</a>
-                </div>
-            """
-        
-        html += """
-                <div class="footer">
-                    <p>This is an automated notification from your Best Buy Price Bot.</p>
-                    <p>Act fast - deals may expire quickly!</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
-
+        banner = _HTML_BANNER.format(
+            count=len(deals),
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
+        deal_blocks = [
+            _HTML_DEAL.format(index=i, savings=deal['retail_price'] - deal['current_price'], **deal)
+            for i, deal in enumerate(deals, 1)
+        ]
+        return _HTML_HEADER + banner + ''.join(deal_blocks) + _HTML_FOOTER
@@ -1,33 +1,104 @@
 """Storage module for tracking deals found."""
-import json
+import atexit
+import hashlib
+import orjson
 import os
 from typing import List, Dict, Set
 from datetime import datetime
 import config
 
 
+# Scraper-internal product fields that aren't written to the deals log
+_INTERNAL_KEYS = ('_deal_id', 'is_deep_discount')
+
+
 class DealStorage:
-    """Manage storage of deals to avoid duplicate notifications."""
+    """
+    Manage storage of deals to avoid duplicate notifications.
+    
+    Deals are logged as JSON Lines (one deal per line), so saving only
+    appends the new deals instead of rewriting the whole history.
+    """
     
-    def __init__(self, filepath: str = None):
+    def __init__(self, filepath: str = None, batch_size: int = None):
         self.filepath = filepath or config.DEALS_LOG_FILE
-        self.deals_cache: Set[str] = set()
+        self.batch_size = batch_size or config.DEALS_SAVE_BATCH_SIZE
+        self.deals_cache: Set[int] = set()
+        # Serialized deals waiting to be appended on the next flush
+        self._pending: List[bytes] = []
+        self._migrate_legacy_log()
         self._load_cache()
+        atexit.register(self.flush)
+    
+    def _migrate_legacy_log(self) -> None:
+        """
+        Convert an old single-document log ({"deals": [...]}) to JSON Lines.
+        
+        Handles both an old-format file at self.filepath and an old
+        deals_found.json next to a not-yet-created .jsonl log. The converted
+        file is written to a temp path and swapped in atomically; if that
+        fails the error is raised, so the bot never starts appending to a log
+        that would hide or corrupt the old history.
+        """
+        legacy_path = self.filepath
+        if not os.path.exists(self.filepath):
+            legacy_path = os.path.splitext(self.filepath)[0] + '.json'
+            if not os.path.exists(legacy_path):
+                return
+        
+        with open(legacy_path, 'rb') as f:
+            content = f.read()
+        try:
+            data = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Not a single JSON document, so it's already JSON Lines
+            return
+        if not isinstance(data, dict) or not isinstance(data.get('deals'), list):
+            return
+        
+        deals = data['deals']
+        tmp_path = self.filepath + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(b''.join(orjson.dumps(deal) + b'\n' for deal in deals))
+            os.replace(tmp_path, self.filepath)
+        except Exception as e:
+            print(f"Error migrating legacy deals log {legacy_path}: {e}")
+            raise
+        print(f"Migrated {len(deals)} deal(s) from {legacy_path} to {self.filepath}")
+    
+    def _read_deals(self) -> List[Dict]:
+        """
+        Read all deals from the log file.
+        
+        Returns:
+            List of stored deals, skipping any unreadable lines
+        """
+        if not os.path.exists(self.filepath):
+            return []
+        
+        deals = []
+        with open(self.filepath, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    deals.append(orjson.loads(line))
+                except orjson.JSONDecodeError as e:
+                    print(f"Skipping unreadable line in {self.filepath}: {e}")
+        return deals
     
     def _load_cache(self) -> None:
         """Load previously found deals from file."""
-        if os.path.exists(self.filepath):
-            try:
-                with open(self.filepath, 'r') as f:
-                    data = json.load(f)
-                    # Create cache of deal identifiers
-                    for deal in data.get('deals', []):
-                        deal_id = self._create_deal_id(deal)
-                        self.deals_cache.add(deal_id)
-            except Exception as e:
-                print(f"Error loading deals cache: {e}")
+        try:
+            # Create cache of deal identifiers
+            for deal in self._read_deals():
+                deal_id = self._create_deal_id(deal)
+                self.deals_cache.add(deal_id)
+        except Exception as e:
+            print(f"Error loading deals cache: {e}")
     
-    def _create_deal_id(self, deal: Dict) -> str:
+    def _create_deal_id(self, deal: Dict) -> int:
         """
         Create unique identifier for a deal.
         
@@ -35,12 +106,14 @@ class DealStorage:
             deal: Deal dictionary
             
         Returns:
-            Unique string identifier
+            64-bit integer fingerprint of the deal
         """
-        # Use product name and current price as identifier
+        # Use product name and current price as identifier, hashed to a
+        # fixed-size int so the seen-deals set doesn't hold every name
         name = deal.get('name', '').strip()
         price = deal.get('current_price', 0)
-        return f"{name}|{price:.2f}"
+        digest = hashlib.blake2b(f"{name}|{price:.2f}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'little')
     
     def is_new_deal(self, deal: Dict) -> bool:
         """
@@ -59,50 +132,66 @@ class DealStorage:
         """
         Filter list of deals to only new ones.
         
+        Also drops repeats within the batch (e.g. a product matched by both
+        the laptop and desktop searches).
+        
         Args:
             deals: List of deal dictionaries
             
         Returns:
             List of only new deals
         """
-        return [deal for deal in deals if self.is_new_deal(deal)]
+        new_deals = []
+        batch_ids: Set[int] = set()
+        for deal in deals:
+            # Remember the id on the deal so save_deals doesn't rebuild it
+            deal_id = deal.get('_deal_id')
+            if deal_id is None:
+                deal_id = deal['_deal_id'] = self._create_deal_id(deal)
+            if deal_id not in self.deals_cache and deal_id not in batch_ids:
+                batch_ids.add(deal_id)
+                new_deals.append(deal)
+        return new_deals
     
     def save_deals(self, deals: List[Dict]) -> None:
         """
         Save deals to storage file.
         
+        Deals are buffered and appended once at least batch_size are
+        pending; call flush() to write any remainder.
+        
         Args:
             deals: List of deal dictionaries to save
         """
         if not deals:
             return
         
-        # Load existing data
-        existing_data = {'deals': [], 'last_updated': None}
-        if os.path.exists(self.filepath):
-            try:
-                with open(self.filepath, 'r') as f:
-                    existing_data = json.load(f)
-            except Exception as e:
-                print(f"Error loading existing deals: {e}")
-        
         # Add new deals with timestamp
+        found_at = datetime.now().isoformat()
         for deal in deals:
-            deal_with_timestamp = deal.copy()
-            deal_with_timestamp['found_at'] = datetime.now().isoformat()
-            existing_data['deals'].append(deal_with_timestamp)
+            deal_id = deal.get('_deal_id')
+            if deal_id is None:
+                deal_id = self._create_deal_id(deal)
+            deal_with_timestamp = {k: v for k, v in deal.items() if k not in _INTERNAL_KEYS}
+            deal_with_timestamp['found_at'] = found_at
+            self._pending.append(orjson.dumps(deal_with_timestamp) + b'\n')
             
             # Update cache
-            deal_id = self._create_deal_id(deal)
             self.deals_cache.add(deal_id)
         
-        existing_data['last_updated'] = datetime.now().isoformat()
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Append all pending deals to the log in a single write."""
+        if not self._pending:
+            return
         
-        # Save to file
         try:
-            with open(self.filepath, 'w') as f:
-                json.dump(existing_data, f, indent=2)
-            print(f"Saved {len(deals)} deal(s) to {self.filepath}")
+            with open(self.filepath, 'ab') as f:
+                f.write(b''.join(self._pending))
+            print(f"Saved {len(self._pending)} deal(s) to {self.filepath}")
+            self._pending = []
         except Exception as e:
             print(f"Error saving deals: {e}")
     
@@ -113,13 +202,9 @@ class DealStorage:
         Returns:
             List of all stored deals
         """
-        if not os.path.exists(self.filepath):
-            return []
-        
+        self.flush()
         try:
-            with open(self.filepath, 'r') as f:
-                data = json.load(f)
-                return data.get('deals', [])
+            return self._read_deals()
         except Exception as e:
             print(f"Error reading deals: {e}")
             return []